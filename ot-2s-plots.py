@@ -2,10 +2,12 @@
 
 """ Extract all plots from Middleware scan. """
 
-from plots import plots
-
 if __name__ == "__main__":
 
+    # Imported here, so fit worker processes which are spawned instead of
+    # forked do not import ROOT when they re-run this script
+    from plots import plots
+
     plots = plots('rootfiles/Commissioning_fitS0_CBCall_maskNone_0.root', 'test01/')
     #plots.getAllPlots()
     plots.getScurvePerCbc([0, 1])
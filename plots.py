@@ -3,8 +3,14 @@
 """ Extract all plots from Middleware scan. """
 
 import logging
-from os import makedirs, chdir, getcwd, path
-from ROOT import TFile, TCanvas, Math, TF1, gStyle
+from itertools import chain
+from multiprocessing import Pool, cpu_count
+from os import makedirs, path
+import numpy as np
+import ROOT
+from ROOT import TFile, TCanvas, Math, TF1, gInterpreter, gROOT, gStyle, \
+                 SetOwnership
+from scurvefit import fitErrfTask
 
 # Set up logger
 # DEBUG (10), INFO (20), WARNING(30), ERROR(40), CRITICAL(50)
@@ -12,6 +18,32 @@ logging.basicConfig(format='%(levelname)-8s - %(message)s',
                     level=logging.INFO)
 LGR = logging.getLogger(__name__)
 
+# Plots are only saved, never displayed, so don't open any graphics windows
+gROOT.SetBatch(True)
+
+# Error function as compiled C++, so TF1 evaluates it natively instead of
+# interpreting a TFormula
+gInterpreter.Declare('''
+#include <cmath>
+double plots_errf(double *x, double *p)
+{
+    return .5 + .5*std::erf((x[0]-p[0])/p[1]);
+}
+''')
+
+# Color palettes: a handful of easily distinguishable colors, and all colors
+_COLORS_NICE = tuple(range(2, 10))
+_COLORS_ALL = tuple(chain(range(394, 405), range(406, 421), range(422, 437),
+                          range(590, 605), range(606, 621), range(622, 637),
+                          range(791, 911)))
+
+# Histogram classes whose bin contents can be read from GetArray()
+_BUFFER_DTYPES = {'TH1D': np.float64, 'TH1F': np.float32}
+
+# Fewer S-curves than this are fitted in this process; starting the worker
+# processes would take longer than the fits
+_POOL_MIN_TASKS = 16
+
 class plots(object):
 
     """ Extract all plots from Middleware scan. """
@@ -23,17 +55,47 @@ class plots(object):
         self._rootfile = TFile(inputfile)
         self._directory = outputfolder
         self._canvas = TCanvas()
+        # Second canvas, to draw fitted functions while histograms are drawn
+        self._canvas_fit = TCanvas('canvas_fit', 'canvas_fit')
+        self._canvas.cd()
         self._histos = []
         self._histos_good = []
         self._histos_bad = []
         self._shifts = []
         self._widths = []
+        self._xmin = None
+        self._xmax = None
+        self._pdf = None
+        # Worker processes for the S-curve fits, started when first needed
+        self._pool = None
+        # First object drawn by the _draw_all_* methods, holding the axes
+        self._frame = None
+        # Error function to draw the fitted S-curves with, built only once
+        self._errf = TF1('errf', ROOT.plots_errf, 0., 254., 2)
+
+        # Create output directory and all directories of the rootfile once,
+        # so plots can be saved by path without checking for them; '' is the
+        # output directory itself
         makedirs(outputfolder)
+        self._known_dirs = set(kname.rpartition('/')[0]
+                               for kname in self._getKeys())
+        self._known_dirs.add('')
+        for subdir in self._known_dirs:
+            if subdir and not path.isdir(path.join(outputfolder, subdir)):
+                makedirs(path.join(outputfolder, subdir))
+
         gStyle.SetOptStat(000000000)
 
-    def getAllPlots(self):
+    def getAllPlots(self, single_pdf=False):
 
-        """ Get all the plots. """
+        """ Get all the plots.
+        Parameters:
+            single_pdf: If True, save all plots as pages of all.pdf instead
+                        of one *.pdf per plot
+        """
+
+        if single_pdf:
+            self._save('all', pdf_state='open')
 
         for kname in self._getKeys():
 
@@ -45,30 +107,68 @@ class plots(object):
             histo.Draw()
 
             # Save it as pdf
-            self._save(kname)
+            if single_pdf:
+                self._save(kname, pdf_state='page')
+            else:
+                self._save(kname)
+
+        if single_pdf:
+            self._save('all', pdf_state='close')
 
-    def getScurvePerCbc(self, cbcs=range(0, 8), channels=-1):
+    def getScurvePerCbc(self, cbcs=range(0, 8), channels=-1,
+                        per_channel=False):
 
         """ Fit all Scurves and put them into one histogram. Also plot shifts
         (offsets) and widths (noise).
         Parameters:
             cbcs: List of CBC's to plot
             channels: Number of channels to plot; -1 for all
+            per_channel: If True, also save the fit of every single channel
         """
 
-        for cbc in cbcs:
-            self._drawScurves(cbc, channels)
+        # Directory name in rootfile
+        dirname = 'Final0'
 
-    def _drawScurves(self, cbc, channels):
+        # Sort the S-curves by CBC in a single pass over the rootfile; the
+        # CBC index is read from the key name, between 'Cbc' and the next '_'
+        prefix = '{}/Scurve_Be0_Fe0_Cbc'.format(dirname)
+        keys = {cbc: [] for cbc in cbcs}
+        for kname in self._getKeys(dirname):
+            if not kname.startswith(prefix):
+                continue
+            idx, sep, _ = kname[len(prefix):].partition('_')
+            if sep and idx.isdigit():
+                bucket = keys.get(int(idx))
+                if bucket is not None:
+                    bucket.append(kname)
+
+        # The worker processes for the fits are shared by all CBCs
+        try:
+            for cbc in cbcs:
+                self._drawScurves(cbc, channels, keys[cbc], per_channel)
+        finally:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+
+    def _drawScurves(self, cbc, channels, keys, per_channel=False):
 
         """ Make the fits to draw the Scurves.
         Parameters:
             cbc: CBC to plot
             channels: Number of channels to plot; -1 for all
+            keys: Names of the S-curves of that CBC in the rootfile
+            per_channel: If True, also save the fit of every single channel
         """
 
-        # Directory name in rootfile
-        dirname = 'Final0'
+        # Forget the S-curves of the previous CBC; lists are emptied in
+        # place, list.clear() does not exist in Python 2
+        del self._histos[:]
+        del self._histos_good[:]
+        del self._histos_bad[:]
+        del self._shifts[:]
+        del self._widths[:]
 
         # Counter of fitted histograms
         count = 0
@@ -76,67 +176,73 @@ class plots(object):
         # Chi2 limit to distinguish good from bad fits
         chi2 = .05
 
-        # Loop over all keys in subdirectory
-        for kname in self._getKeys(dirname):
+        # Use easily distinguishable colors if there are only a few channels
+        nice = 0 < channels < 19
+
+        # Stream all single channel plots into one multi-page *.pdf
+        if per_channel:
+            self._save('scurves_cbc{}_channels'.format(cbc),
+                       pdf_state='open')
+
+        # Loop over all fitted S-curves of this CBC
+        for kname, histo, func in self._fitScurves(keys, channels):
 
             # Only plot a limited number of channels
             if channels > 0 and count >= channels:
                 break
 
-            # Only select S-Curves of a given CBC
-            if not kname.startswith('{}/Scurve_Be0_Fe0_Cbc{}'
-                                    .format(dirname, cbc)):
-                continue
-
-            # Error function with guessed parameters
-            errf = TF1('errf', '.5 + .5*erf((x-[0])/[1])', 0., 254.)
-            errf.SetParameter(0, 120.)  # shift
-            errf.SetParameter(1, 10.)  # width
-
-            # Fit
-            histo = self._rootfile.Get(kname)
-            histo.Fit('errf', 'RQ')
-
             # If fit failed, skip it
-            try:
-                histo.GetFunction('errf').GetParameter(0)
-            except TypeError:
+            if func is None:
                 continue
 
             # Colors!
-            histo.SetLineColor(self._getColor(count, (channels>0 and channels<19)))
-            histo.SetMarkerColor(self._getColor(count, (channels>0 and channels<19)))
-            histo.GetFunction('errf').SetLineColor(self._getColor(count, (channels>0 and channels<19)))
+            color = self._getColor(count, nice)
+            histo.SetLineColor(color)
+            histo.SetMarkerColor(color)
+            func.SetLineColor(color)
 
             # Markers!
             histo.SetMarkerStyle(count % 15 + 20)
             histo.SetMarkerSize(.8)
 
             # Save values for future use
-            self._shifts.append(histo.GetFunction('errf').GetParameter(0))
-            self._widths.append(histo.GetFunction('errf').GetParameter(1))
+            self._shifts.append(func.GetParameter(0))
+            self._widths.append(func.GetParameter(1))
             self._histos.append(histo)
 
             # Save histograms either in list of good fits or in list of bad fits
-            if histo.GetFunction('errf').GetChisquare() <= chi2:
+            if func.GetChisquare() <= chi2:
                 self._histos_good.append(histo)
             else:
                 self._histos_bad.append(histo)
 
-            # Save histogram with fit
-            histo.Draw()
-            self._save('{}_fit'.format(kname))
+            if per_channel:
+                # Save histogram with fit
+                histo.Draw()
+                self._save('{}_fit'.format(kname), pdf_state='page')
 
-            # Save smoothed histogram
-            histo.Draw('C HIST')
-            self._save('{}_smooth'.format(kname))
+                # Save smoothed histogram, by changing the draw option of
+                # the histogram already on the canvas instead of redrawing
+                histo.SetDrawOption('C HIST')
+                self._canvas.Modified()
+                self._save('{}_smooth'.format(kname), pdf_state='page')
 
             # Count the number of histograms
             count += 1
 
-        # Draw all error functions in one histogram
+        if per_channel:
+            self._save('scurves_cbc{}_channels'.format(cbc),
+                       pdf_state='close')
+
+        # Plot range, shared by all histograms below
+        self._computeXrange()
+
+        # Draw all error functions in one histogram, and all fitted error
+        # functions in another one
         self._draw_all_errf(self._histos, 'S-curves for CBC {}'.format(cbc),
-                            'scurves_cbc{}'.format(cbc))
+                            'scurves_cbc{}'.format(cbc),
+                            'Fitted S-curves for CBC {}'.format(cbc),
+                            'scurves_cbc{}_fit'.format(cbc))
 
         # Draw all good error functions in one histogram
         self._draw_all_errf(self._histos_good,
@@ -150,25 +256,182 @@ class plots(object):
                             .format(cbc, chi2),
                             'scurves_cbc{}_bad'.format(cbc))
 
-        # Draw all fitted error functions in one histogram
-        self._draw_all_errf_fit(self._histos, 'Fitted S-curves for CBC {}'
-                                .format(cbc), 'scurves_cbc{}_fit'.format(cbc))
-
         # Draw all fitted error functions and measurements in one histogram
         self._draw_all_errf_fit_meas(self._histos, 'Fitted S-curves for CBC {}'
                                      .format(cbc), 'scurves_cbc{}_fit_meas'
                                      .format(cbc))
 
-    def _draw_all_errf(self, histos, title, name):
+    def _fitScurves(self, keys, channels=-1):
 
-        """ Draw all error functions in one histogram
+        """ Fit S-curves in parallel; yields name, histogram and fitted
+        function (None if the fit failed), in the order of the keys.
+        Parameters:
+            keys: Names of the S-curves in the rootfile
+            channels: Number of successful fits needed; -1 for all
+        """
+
+        # The fits are independent of each other, so only the bin contents
+        # are sent to worker processes; ROOT objects stay in this process
+        fitted = 0
+        start = 0
+        while start < len(keys) and (channels <= 0 or fitted < channels):
+
+            # Without a limit on the channels, read and fit all S-curves at
+            # once; otherwise only read and fit batches of S-curves, just
+            # large enough to keep all workers busy, until enough fits
+            # succeeded
+            if channels > 0:
+                size = max(channels - fitted, cpu_count())
+            else:
+                size = len(keys)
+            batch = keys[start:start+size]
+            start += size
+
+            histos = [self._rootfile.Get(kname) for kname in batch]
+
+            # Empty or flat S-curves cannot be fitted, so don't even try
+            fittable = [self._isFittable(histo) for histo in histos]
+            LGR.debug('Skipping fit of {} out of {} S-curves'
+                      .format(fittable.count(False), len(fittable)))
+
+            tasks = [self._getBins(histo) + (self._errf.GetXmin(),
+                                             self._errf.GetXmax())
+                     for histo, fit in zip(histos, fittable) if fit]
+
+            # A batch is fitted completely before it is returned if the
+            # caller may stop early, so no fits are left over in the shared
+            # workers; all S-curves are returned as they are fitted
+            results = self._mapFits(tasks, lazy=channels <= 0)
+            for kname, histo, fit in zip(batch, histos, fittable):
+                result = next(results) if fit else None
+                func = self._attachErrf(histo, result)
+                if func is not None:
+                    fitted += 1
+                yield kname, histo, func
+
+    def _mapFits(self, tasks, lazy=False):
+
+        """ Fit S-curves, in worker processes if there are enough of them;
+        returns an iterator over the results of fitErrf.
+        Parameters:
+            tasks: Arguments of fitErrf for every S-curve
+            lazy: If True, return results as soon as they are fitted
+        """
+
+        if len(tasks) < _POOL_MIN_TASKS:
+            return iter([fitErrfTask(task) for task in tasks])
+
+        if self._pool is None:
+            self._pool = Pool()
+
+        if lazy:
+            return self._pool.imap(fitErrfTask, tasks, chunksize=8)
+        return iter(self._pool.map(fitErrfTask, tasks, chunksize=8))
+
+    def _isFittable(self, histo, min_entries=10):
+
+        """ Check whether an S-curve has enough entries and is not flat.
+        Parameters:
+            histo: S-curve to check
+            min_entries: Minimum number of entries
+        """
+
+        if histo.GetEntries() < min_entries or histo.GetMaximum() <= 0:
+            return False
+
+        return histo.GetMaximum() != histo.GetMinimum()
+
+    def _attachErrf(self, histo, result):
+
+        """ Attach the fitted error function to the histogram as 'errf';
+        returns the function, or None if the fit failed.
+        Parameters:
+            histo: Fitted S-curve
+            result: Shift, width, chi2 and NDF from fitErrf, or None
+        """
+
+        # Like TH1::Fit, replace the function of an earlier fit; it is only
+        # removed, not deleted, since it may still be drawn on a canvas
+        functions = histo.GetListOfFunctions()
+        old = functions.FindObject('errf')
+        if old:
+            functions.Remove(old)
+
+        if result is None:
+            return None
+        shift, width, chi2, ndf = result
+
+        # Function to draw, owned by the histogram like after TH1::Fit
+        func = self._errf.Clone()
+        SetOwnership(func, False)
+        func.SetParameters(shift, width)
+        func.SetChisquare(chi2)
+        func.SetNDF(ndf)
+        functions.Add(func)
+
+        return func
+
+    def _getBins(self, histo):
+
+        """ Get bin centers, contents and errors of a histogram as arrays.
+        Parameters:
+            histo: Histogram to read
+        """
+
+        nbins = histo.GetNbinsX()
+
+        # Bin contents of TH1D and TH1F are viewed directly in the memory of
+        # the histogram, without copying; the first and last entries of the
+        # buffer are under- and overflow. Only the exact classes are read
+        # this way: in subclasses like TProfile, the buffer does not hold
+        # the bin contents
+        dtype = _BUFFER_DTYPES.get(histo.IsA().GetName())
+        if dtype is not None:
+            ys = np.frombuffer(histo.GetArray(), dtype=dtype,
+                               count=nbins+2)[1:nbins+1]
+
+            # Bin errors, like TH1::GetBinError
+            if histo.GetSumw2N():
+                errs = np.sqrt(np.frombuffer(histo.GetSumw2().GetArray(),
+                                             dtype=np.float64,
+                                             count=nbins+2)[1:nbins+1])
+            else:
+                errs = np.sqrt(np.abs(ys))
+        else:
+            bins = range(1, nbins+1)
+            ys = np.array([histo.GetBinContent(i) for i in bins])
+            errs = np.array([histo.GetBinError(i) for i in bins])
+
+        # Bin centers, for variable or fixed bin widths
+        axis = histo.GetXaxis()
+        if axis.GetXbins().GetSize():
+            edges = np.frombuffer(axis.GetXbins().GetArray(),
+                                  dtype=np.float64, count=nbins+1)
+            xs = .5 * (edges[:-1] + edges[1:])
+        else:
+            width = (axis.GetXmax() - axis.GetXmin()) / nbins
+            xs = np.linspace(axis.GetXmin() + .5*width,
+                             axis.GetXmax() - .5*width, nbins)
+
+        return xs, ys, errs
+
+    def _draw_all_errf(self, histos, title, name, title_fit=None,
+                       name_fit=None):
+
+        """ Draw all error functions in one histogram; if name_fit is given,
+        draw all fitted error functions in another one in the same loop
         Parameters:
             histos: List of histograms to plot
             title: Title of histogram
             name: Name of histogram
+            title_fit: Title of histogram with fitted functions
+            name_fit: Name of histogram with fitted functions
         """
 
         self._canvas.Clear()
+        self._canvas_fit.Clear()
+        self._frame = None
+        frame_fit = None
 
         for idx, histo in enumerate(histos):
 
@@ -176,44 +439,41 @@ class plots(object):
                 # Dynamically set plot range
                 histo.GetXaxis().SetRangeUser(self._getXmin(), self._getXmax())
                 histo.Draw('C HIST')
+                self._frame = histo
                 histo.SetTitle(title)
                 histo.GetXaxis().SetTitle('VCth units')
                 histo.GetYaxis().SetTitle('Occupancy')
             else:
                 histo.Draw('C HIST SAME')
 
-        self._save(name)
-        self._save('{}_log'.format(name), True)
-
-    def _draw_all_errf_fit(self, histos, title, name):
-
-        """ Draw all error functions in one histogram
-        Parameters:
-            histos: List of histograms to plot
-            title: Title of histogram
-            name: Name of histogram
-        """
-
-        self._canvas.Clear()
-
-        for idx, histo in enumerate(histos):
+            if name_fit is None:
+                continue
 
-            # Get fitted function
+            # Get fitted function and draw it on the other canvas
             func = histo.GetFunction('errf')
+            self._canvas_fit.cd()
 
             if idx == 0:
                 # Dynamically set plot range
                 func.SetRange(self._getXmin(), self._getXmax())
                 func.Draw()
-                func.SetTitle(title)
+                frame_fit = func
+                func.SetTitle(title_fit)
                 func.GetXaxis().SetTitle('VCth units')
                 func.GetYaxis().SetTitle('Occupancy')
             else:
                 func.Draw('SAME')
 
+            self._canvas.cd()
+
         self._save(name)
         self._save('{}_log'.format(name), True)
 
+        if name_fit is not None:
+            self._save(name_fit, canvas=self._canvas_fit, frame=frame_fit)
+            self._save('{}_log'.format(name_fit), True,
+                       canvas=self._canvas_fit, frame=frame_fit)
+
     def _draw_all_errf_fit_meas(self, histos, title, name):
 
         """ Draw all error functions in one histogram
@@ -224,6 +484,7 @@ class plots(object):
         """
 
         self._canvas.Clear()
+        self._frame = None
 
         for idx, histo in enumerate(histos):
 
@@ -231,6 +492,7 @@ class plots(object):
                 # Dynamically set plot range
                 histo.GetXaxis().SetRangeUser(self._getXmin(), self._getXmax())
                 histo.Draw('P')
+                self._frame = histo
                 histo.SetTitle(title)
                 histo.GetXaxis().SetTitle('VCth units')
                 histo.GetYaxis().SetTitle('Occupancy')
@@ -251,91 +513,115 @@ class plots(object):
         # If subdir is defined, loop over keys in folder, otherwise loop over
         # keys in rootfile
         if subdir:
-
             obj = self._rootfile.Get(subdir)
         else:
             obj = self._rootfile
 
-        # Loop over all keys
-        for key in obj.GetListOfKeys():
-
-            if subdir:
-                kname = '{}/{}'.format(subdir, key.GetName())
-            else:
-                kname = key.GetName()
+        # Walk the folders depth first with an explicit stack of key
+        # iterators, which keeps the order of the keys in the rootfile; the
+        # path prefix of the key names is built once per folder
+        stack = [(subdir + '/' if subdir else '', obj,
+                  iter(obj.GetListOfKeys()))]
+        while stack:
+            prefix, obj, keys = stack[-1]
+            for key in keys:
+                name = key.GetName()
+                kname = prefix + name
+
+                # If key is a folder, continue with the keys in that folder,
+                # reusing the folder object instead of getting it by path
+                if key.IsFolder():
+                    folder = obj.Get(name)
+                    stack.append((kname + '/', folder,
+                                  iter(folder.GetListOfKeys())))
+                    break
 
-            # If key is a folder, go into that folder and loop over all keys
-            if key.IsFolder():
-                for knamesub in self._getKeys(kname):
-                    yield knamesub
-            else:
                 yield kname
+            else:
+                stack.pop()
 
-    def _save(self, name, logy=False):
+    def _save(self, name, logy=False, pdf_state=None, canvas=None,
+              frame=None):
 
         """ Save histogram as *.pdf.
         Parameters:
-            name: Name of *.pdf, possibly including path; directories are
-                  created on the fly
+            name: Name of *.pdf, possibly including path, relative to the
+                  output folder; directories are created on the fly, unless
+                  they were already created for the rootfile
             logy: Plot Y-axis in log
+            pdf_state: None to save a single *.pdf; 'open', 'page' or 'close'
+                       to stream several pages into one multi-page *.pdf, in
+                       which case name is the title of the page for 'page'
+            canvas: Canvas to save; the main canvas if None
+            frame: First object drawn on canvas, holding the axes; for the
+                   main canvas, the one drawn by the _draw_all_* methods
         """
 
-        # Go into directory if it is defined
-        if self._directory:
-            cwd = getcwd()
-
-            # Create directory on filesystem
-            if not path.exists(self._directory):
-                makedirs(self._directory)
-            chdir(self._directory)
+        if canvas is None:
+            canvas, frame = self._canvas, self._frame
 
-        # If canvas is to be stored in a subdirectory, create it
-        if '/' in name:
-            subdir = name[:name.find('/')]
-            if not path.exists(subdir):
-                makedirs(subdir)
+        # If canvas is to be stored in a new subdirectory, create it
+        if pdf_state != 'page':
+            subdir = name.rpartition('/')[0]
+            if subdir not in self._known_dirs:
+                if not path.isdir(path.join(self._directory, subdir)):
+                    makedirs(path.join(self._directory, subdir))
+                self._known_dirs.add(subdir)
 
-        # Set Y-axis to log if requested
+        # Set Y-axis to log if requested, on the first object drawn
         if logy:
-            self._canvas.SetLogy()
-            # This is probably not failsafe, empirically, the first primitive
-            # is the frame, the second one an object, if this is not the case,
-            # it might fail
-            try:
-                self._canvas.GetListOfPrimitives().At(1).GetYaxis().SetRangeUser(1e-7, 2.)
-            except AttributeError:
+            canvas.SetLogy()
+            if frame is None:
                 LGR.warning('Cannot set Y-Axis to log')
-
-        # Save as *.pdf
-        self._canvas.SaveAs('{}.pdf'.format(name))
+            else:
+                frame.GetYaxis().SetRangeUser(1e-7, 2.)
+
+        # Save as *.pdf, or open, fill and close a multi-page *.pdf
+        if pdf_state == 'open':
+            self._pdf = '{}.pdf'.format(path.join(self._directory, name))
+            canvas.Print('{}['.format(self._pdf))
+        elif pdf_state == 'page':
+            canvas.Print(self._pdf, 'Title:{}'.format(name))
+        elif pdf_state == 'close':
+            canvas.Print('{}]'.format(self._pdf))
+            self._pdf = None
+        else:
+            canvas.SaveAs('{}.pdf'.format(path.join(self._directory, name)))
 
         # Unset log scale
         if logy:
-            self._canvas.SetLogy(False)
-            try:
-                self._canvas.GetListOfPrimitives().At(1).GetYaxis().SetRangeUser(1e-7, 1.05)
-            except AttributeError:
-                pass
+            canvas.SetLogy(False)
+            if frame is not None:
+                frame.GetYaxis().SetRangeUser(1e-7, 1.05)
 
-        # Go back to original working directories
-        if self._directory:
-            chdir(cwd)
+    def _computeXrange(self):
+
+        """ Compute minimum and maximum on X-Axis to plot from the fitted
+        shifts and widths.
+        """
+
+        if not self._shifts:
+            self._xmin = self._xmax = None
+            return
+
+        shifts = np.asarray(self._shifts)
+        widths = np.asarray(self._widths)
+        self._xmin = float((shifts - 5*widths).min())
+        self._xmax = float((shifts + 5*widths).max())
 
     def _getXmin(self):
 
         """ Get minimum on X-Axis to plot.
         """
 
-        return min([shift-5*width for shift, width in
-                    zip(self._shifts, self._widths)])
+        return self._xmin
 
     def _getXmax(self):
 
         """ Get maximum on X-Axis to plot.
         """
 
-        return max([shift+5*width for shift, width in
-                    zip(self._shifts, self._widths)])
+        return self._xmax
 
     def _getColor(self, idx, nice=False):
 
@@ -346,18 +632,6 @@ class plots(object):
                   False, get all colors
         """
 
-        # List with all colors
-        colors = []
-        if nice:
-            colors.extend(range(2, 10))
-        else:
-            #colors.extend(range(390, 405))
-            colors.extend(range(394, 405))
-            colors.extend(range(406, 421))
-            colors.extend(range(422, 437))
-            colors.extend(range(590, 605))
-            colors.extend(range(606, 621))
-            colors.extend(range(622, 637))
-            colors.extend(range(791, 911))
+        colors = _COLORS_NICE if nice else _COLORS_ALL
 
         return colors[idx % len(colors)]
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+
+""" Fit S-curves with an error function. Does not import ROOT, so worker
+processes fitting S-curves start without it, also when they are spawned
+instead of forked. """
+
+import numpy as np
+from scipy.optimize import curve_fit
+from scipy.special import erf
+
+def errf(x, shift, width):
+
+    """ Error function the S-curves are fitted with. """
+
+    return .5 + .5*erf((x-shift)/width)
+
+def fitErrf(xs, ys, errs, xmin, xmax):
+
+    """ Fit an S-curve with the error function; returns shift, width, chi2
+    and number of degrees of freedom, or None if the fit failed.
+    Parameters:
+        xs: Bin centers
+        ys: Bin contents
+        errs: Bin errors
+        xmin: Lower edge of fit range
+        xmax: Upper edge of fit range
+    """
+
+    # Like TH1::Fit, only use bins in the fit range which have an error
+    mask = (errs > 0) & (xs >= xmin) & (xs <= xmax)
+    xs, ys, errs = xs[mask], ys[mask], errs[mask]
+
+    try:
+        popt, _ = curve_fit(errf, xs, ys, p0=(120., 10.), sigma=errs,
+                            absolute_sigma=True, maxfev=200)
+    except (RuntimeError, TypeError, ValueError):
+        return None
+
+    chi2 = np.sum(((ys - errf(xs, *popt)) / errs)**2)
+
+    return float(popt[0]), float(popt[1]), float(chi2), len(xs) - 2
+
+def fitErrfTask(task):
+
+    """ Unpack the arguments of fitErrf, for use with Pool.imap. """
+
+    return fitErrf(*task)